@@ -0,0 +1,239 @@
+import os
+import errno
+import shutil
+import tarfile
+import zipfile
+import zlib
+import threading
+from pathlib import Path, PurePosixPath
+from datetime import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+ZIP_SUFFIXES = (".zip", ".jar", ".whl")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+INDEX_CACHE_SIZE = 8
+# non-OSError failures while extracting: corrupt archives, encrypted zip members
+# (RuntimeError), unsupported compression methods (NotImplementedError),
+# truncated streams (EOFError, zlib.error) and tar links whose target is missing (KeyError)
+EXTRACT_ERRORS = (
+    zipfile.BadZipFile,
+    tarfile.TarError,
+    RuntimeError,
+    NotImplementedError,
+    EOFError,
+    zlib.error,
+    KeyError,
+)
+
+
+@dataclass
+class ArchiveMember:
+    name: str
+    path: str
+    directory: bool
+    size: int
+    mtime: float
+    info: zipfile.ZipInfo | tarfile.TarInfo | None = field(default=None, repr=False)
+
+    def is_dir(self) -> bool:
+        return self.directory
+
+
+class ArchiveIndex:
+    """The members of an archive, grouped by the directory they live in."""
+
+    def __init__(self, path: Path, kind: str):
+        self.path = path
+        self.kind = kind
+        self.members: dict[str, ArchiveMember] = {}
+        self.children: dict[str, dict[str, ArchiveMember]] = {"": {}}
+
+    def add(self, path: str, directory: bool, size: int, mtime: float, info) -> None:
+        parts = PurePosixPath(path).parts
+        if not parts or ".." in parts or parts[0] == "/":
+            return
+
+        # archives don't have to contain entries for every parent directory
+        for depth in range(1, len(parts)):
+            parent = "/".join(parts[:depth])
+            if parent not in self.members:
+                self._insert(ArchiveMember(parts[depth - 1], parent, True, 0, mtime))
+
+        self._insert(ArchiveMember(parts[-1], "/".join(parts), directory, size, mtime, info))
+
+    def _insert(self, member: ArchiveMember) -> None:
+        parent = member.path.rpartition("/")[0]
+        self.members[member.path] = member
+        self.children.setdefault(parent, {})[member.name] = member
+        if member.directory:
+            self.children.setdefault(member.path, {})
+
+    def list_directory(self, directory: str) -> list[ArchiveMember]:
+        """Return the visible members of `directory`, directories first, each group sorted by name."""
+        if directory not in self.children:
+            raise FileNotFoundError(errno.ENOENT, "No such directory in archive", f"{self.path}/{directory}")
+
+        members = [m for m in self.children[directory].values() if m.name[0] != "."]
+        return sorted(members, key=lambda m: (not m.directory, m.name))
+
+    def walk(self, directory: str) -> list[ArchiveMember]:
+        """Return every member below `directory`, in the order they are stored in the archive."""
+        prefix = f"{directory}/"
+        members = [m for path, m in self.members.items() if path.startswith(prefix)]
+        if self.kind == "tar":
+            # reading in file order keeps compressed tars from rewinding for every member
+            members.sort(key=lambda m: m.info.offset_data if m.info is not None else 0)
+        return members
+
+
+def is_archive_name(name: str) -> bool:
+    return name.lower().endswith(ZIP_SUFFIXES + TAR_SUFFIXES)
+
+
+def split_archive_path(path: Path) -> tuple[Path, str] | None:
+    """Split a path that points into an archive into `(archive, member path)`.
+
+    Returns None if no component of `path` is an archive file.
+    """
+    for candidate in (path, *path.parents):
+        if is_archive_name(candidate.name) and candidate.is_file():
+            inner = path.relative_to(candidate)
+            return candidate, "" if inner == Path(".") else inner.as_posix()
+    return None
+
+
+def is_archive_directory(path: Path) -> bool:
+    """Return True if `path` is an archive file or a directory inside one.
+
+    An archive file itself isn't opened here, so listing it can still fail
+    if it turns out to be corrupt.
+    """
+    location = split_archive_path(path)
+    if location is None:
+        return False
+
+    archive, inner = location
+    if inner == "":
+        return True
+    try:
+        member = archive_index(archive).members.get(inner)
+    except OSError:
+        return False
+    return member is not None and member.directory
+
+
+def _zip_mtime(info: zipfile.ZipInfo) -> float:
+    try:
+        return datetime(*info.date_time).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _build_index(archive: Path) -> ArchiveIndex:
+    try:
+        if archive.name.lower().endswith(ZIP_SUFFIXES):
+            index = ArchiveIndex(archive, "zip")
+            # ZipFile only reads the central directory at the end of the file
+            with zipfile.ZipFile(archive) as zf:
+                for info in zf.infolist():
+                    index.add(info.filename, info.is_dir(), info.file_size, _zip_mtime(info), info)
+        else:
+            index = ArchiveIndex(archive, "tar")
+            with tarfile.open(archive, "r:*") as tf:
+                for info in tf:
+                    if info.isdir() or info.isreg() or info.issym() or info.islnk():
+                        index.add(info.name, info.isdir(), info.size, info.mtime, info)
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise OSError(f"Cannot read archive {archive.name}: {e}") from e
+    return index
+
+
+_indexes: OrderedDict[tuple[str, int, int], ArchiveIndex] = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def _index_key(archive: Path) -> tuple[str, int, int]:
+    # size and mtime are part of the key, so a rewritten archive is indexed again
+    stat_info = archive.stat()
+    return str(archive), stat_info.st_size, stat_info.st_mtime_ns
+
+
+def cached_archive_index(archive: Path) -> ArchiveIndex | None:
+    """Return the index of `archive` if it has already been read, without reading it."""
+    key = _index_key(archive)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+    return index
+
+
+def archive_index(archive: Path) -> ArchiveIndex:
+    index = cached_archive_index(archive)
+    if index is None:
+        key = _index_key(archive)
+        index = _build_index(archive)
+        with _indexes_lock:
+            _indexes[key] = index
+            while len(_indexes) > INDEX_CACHE_SIZE:
+                _indexes.popitem(last=False)
+    return index
+
+
+def list_archive(archive: Path, inner: str) -> list[ArchiveMember]:
+    return archive_index(archive).list_directory(inner)
+
+
+def _extract_file(handle, index: ArchiveIndex, member: ArchiveMember, target: Path) -> None:
+    if index.kind == "zip":
+        source = handle.open(member.info)
+    else:
+        source = handle.extractfile(member.info)
+        if source is None:
+            raise OSError(f"Cannot extract {member.path}: not a regular file")
+
+    with source, open(target, "xb") as destination:
+        shutil.copyfileobj(source, destination, EXTRACT_CHUNK_SIZE)
+    os.utime(target, (member.mtime, member.mtime))
+
+
+def extract_member(archive: Path, inner: str, destination: Path) -> Path:
+    """Stream the member `inner` of `archive` (and everything below it) to `destination`.
+
+    Members are copied in fixed-size chunks, so memory use doesn't depend on
+    their size.
+    """
+    index = archive_index(archive)
+    member = index.members.get(inner)
+    if member is None:
+        raise FileNotFoundError(errno.ENOENT, "No such file in archive", f"{archive}/{inner}")
+
+    existed = os.path.lexists(destination)
+    opener = zipfile.ZipFile if index.kind == "zip" else tarfile.open
+    try:
+        with opener(archive) as handle:
+            if not member.directory:
+                _extract_file(handle, index, member, destination)
+                return destination
+
+            destination.mkdir()
+            for child in index.walk(inner):
+                target = destination / child.path[len(inner) + 1:]
+                if child.directory:
+                    target.mkdir(parents=True, exist_ok=True)
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    _extract_file(handle, index, child, target)
+    except (OSError, *EXTRACT_ERRORS) as e:
+        # don't leave a half-extracted member behind
+        if not existed and os.path.lexists(destination):
+            if destination.is_dir() and not destination.is_symlink():
+                shutil.rmtree(destination, ignore_errors=True)
+            else:
+                destination.unlink(missing_ok=True)
+        if isinstance(e, OSError):
+            raise
+        raise OSError(f"Cannot extract {inner} from {archive.name}: {e}") from e
+    return destination
@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import argparse
+from fnmatch import fnmatch
+from pathlib import Path
+from dataclasses import asdict
+from fileops import copy_item, move_item, sync_item
+from listing import entry_is_dir, iter_directory, list_directory, walk_directory
+
+COMMANDS = ("ls", "find", "put")
+HELP_FLAGS = ("-h", "--help")
+
+
+def entry_record(entry: os.DirEntry) -> dict:
+    record = {
+        "name": entry.name,
+        "path": entry.path,
+        "type": "directory" if entry_is_dir(entry) else "file",
+        "size": None,
+        "mtime": None,
+    }
+    try:
+        stat_info = entry.stat()
+        record["size"] = stat_info.st_size
+        record["mtime"] = stat_info.st_mtime
+    except OSError:
+        pass
+    return record
+
+
+def write_line(line: str) -> None:
+    sys.stdout.write(line + "\n")
+
+
+def report_error(error: OSError) -> None:
+    print(f"fsnek: {error}", file=sys.stderr)
+
+
+def command_ls(args: argparse.Namespace) -> int:
+    # sorting needs the whole listing in memory; --unsorted streams straight from scandir
+    entries = iter_directory(args.path) if args.unsorted else list_directory(args.path)
+    for entry in entries:
+        if args.json:
+            write_line(json.dumps(entry_record(entry)))
+        else:
+            write_line(entry.name)
+    return 0
+
+
+def command_find(args: argparse.Namespace) -> int:
+    for entry in walk_directory(args.path, onerror=report_error):
+        if args.name is not None and not fnmatch(entry.name, args.name):
+            continue
+        if args.type is not None and (args.type == "d") != entry_is_dir(entry):
+            continue
+
+        if args.json:
+            write_line(json.dumps(entry_record(entry)))
+        else:
+            write_line(entry.path)
+    return 0
+
+
+def command_put(args: argparse.Namespace) -> int:
+    if args.sync:
+        return command_sync_put(args)
+
+    status = 0
+    for item in args.sources:
+        record = {"source": str(item), "action": "move" if args.move else "copy"}
+        try:
+            if args.move:
+                destination = move_item(item, args.into)
+            else:
+                destination = copy_item(item, args.into)
+            record["destination"] = str(destination)
+        except OSError as e:
+            record["error"] = str(e)
+            status = 1
+
+        if args.json:
+            write_line(json.dumps(record))
+        elif "error" in record:
+            print(f"fsnek: cannot {record['action']} {item}: {record['error']}", file=sys.stderr)
+        else:
+            write_line(record["destination"])
+    return status
+
+
+def command_sync_put(args: argparse.Namespace) -> int:
+    status = 0
+    for item in args.sources:
+        record = {"source": str(item), "action": "sync-move" if args.move else "sync"}
+        try:
+            report = sync_item(item, args.into, checksum=args.checksum, move=args.move)
+            record.update(asdict(report))
+            if report.errors:
+                status = 1
+        except OSError as e:
+            report = None
+            record["errors"] = [str(e)]
+            status = 1
+
+        if args.json:
+            write_line(json.dumps(record))
+            continue
+        for error in record["errors"]:
+            print(f"fsnek: cannot sync {item}: {error}", file=sys.stderr)
+        if report is not None:
+            write_line(f"{item}: {report.summary()}")
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="fsnek",
+        description=(
+            "Non-interactive fsnek commands. Run fsnek without a command, or with a "
+            "directory, to start the TUI. To open a directory named like a command, "
+            "pass it as a path, e.g. ./ls."
+        ),
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ls_parser = subparsers.add_parser("ls", help="list a directory in fsnek order")
+    ls_parser.add_argument("path", nargs="?", type=Path, default=Path("."))
+    ls_parser.add_argument("--json", action="store_true", help="print one JSON object per entry")
+    ls_parser.add_argument(
+        "-U", "--unsorted", action="store_true",
+        help="print entries in directory order without loading the whole listing first",
+    )
+    ls_parser.set_defaults(func=command_ls)
+
+    find_parser = subparsers.add_parser("find", help="recursively list a directory tree")
+    find_parser.add_argument("path", nargs="?", type=Path, default=Path("."))
+    find_parser.add_argument("--name", help="only print entries whose name matches this glob")
+    find_parser.add_argument("--type", choices=("f", "d"), help="only print files (f) or directories (d)")
+    find_parser.add_argument("--json", action="store_true", help="print one JSON object per entry")
+    find_parser.set_defaults(func=command_find)
+
+    put_parser = subparsers.add_parser("put", help="copy or move items into a directory")
+    put_parser.add_argument("sources", nargs="+", type=Path)
+    put_parser.add_argument(
+        "-C", "--into", type=Path, default=Path("."),
+        help="destination directory (default: current directory)",
+    )
+    put_parser.add_argument("--move", action="store_true", help="move instead of copying")
+    put_parser.add_argument(
+        "--sync", action="store_true",
+        help="merge into existing items, copying only new or changed files",
+    )
+    put_parser.add_argument(
+        "--checksum", action="store_true",
+        help="with --sync, compare file contents instead of modification times",
+    )
+    put_parser.add_argument("--json", action="store_true", help="print one JSON object per item")
+    put_parser.set_defaults(func=command_put)
+
+    return parser
+
+
+def run(argv: list[str]) -> int:
+    args = build_parser().parse_args(argv)
+    # stdout is block-buffered when piped; flush every line so results show up as they are found
+    sys.stdout.reconfigure(line_buffering=True)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # the reader went away (e.g. `fsnek ls | head`); stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except OSError as e:
+        report_error(e)
+        return 1
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS + HELP_FLAGS:
+        sys.exit(run(sys.argv[1:]))
+
+    # only the TUI needs Textual
+    from fsnek import main as tui_main
+    tui_main()
+
+
+if __name__ == "__main__":
+    main()
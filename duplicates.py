@@ -0,0 +1,117 @@
+import os
+import hashlib
+from pathlib import Path
+from functools import lru_cache
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable
+from fileops import HASH_WORKERS, file_hash
+from listing import walk_directory
+
+PARTIAL_BLOCK_SIZE = 64 * 1024
+
+FileInfo = tuple[Path, os.stat_result]
+
+
+@lru_cache(maxsize=65536)
+def _partial_hash(path: str, size: int, mtime_ns: int) -> str:
+    # hashes the first and last block; files up to two blocks long are hashed completely
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        digest.update(f.read(PARTIAL_BLOCK_SIZE))
+        if size > 2 * PARTIAL_BLOCK_SIZE:
+            f.seek(-PARTIAL_BLOCK_SIZE, os.SEEK_END)
+        digest.update(f.read(PARTIAL_BLOCK_SIZE))
+    return digest.hexdigest()
+
+
+def partial_hash(path: Path, stat_info: os.stat_result) -> str:
+    """Return a hash of the first and last blocks of `path`, cached per (path, size, mtime)."""
+    return _partial_hash(str(path), stat_info.st_size, stat_info.st_mtime_ns)
+
+
+def _group_by_hash(
+    executor: Executor,
+    hasher: Callable[[Path, os.stat_result], str],
+    files: list[FileInfo],
+    is_cancelled: Callable[[], bool],
+) -> list[list[FileInfo]]:
+    def hash_or_none(file: FileInfo) -> str | None:
+        # files queued after a cancel are skipped instead of hashed
+        if is_cancelled():
+            return None
+        try:
+            return hasher(*file)
+        except OSError:
+            return None
+
+    groups: dict[tuple[int, str], list[FileInfo]] = {}
+    for file, digest in zip(files, executor.map(hash_or_none, files)):
+        if digest is not None:
+            groups.setdefault((file[1].st_size, digest), []).append(file)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def find_duplicates(
+    root: Path,
+    min_size: int = 1,
+    workers: int = HASH_WORKERS,
+    is_cancelled: Callable[[], bool] = lambda: False,
+) -> list[list[Path]]:
+    """Return groups of files below `root` with identical contents.
+
+    Files are bucketed by size, then by a hash of their first and last
+    blocks, and only the files still sharing a bucket are hashed in full.
+    Hashing runs in a thread pool. Groups are ordered by how much space
+    removing all but one copy would free, largest first.
+
+    `is_cancelled` is polled while walking and between phases; once it
+    returns True the search stops and returns no groups.
+    """
+    by_size: dict[int, list[FileInfo]] = {}
+    seen_inodes = set()
+    for entry in walk_directory(root):
+        if is_cancelled():
+            return []
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            stat_info = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+
+        # hard links share their data, deleting one of them frees nothing
+        inode = (stat_info.st_dev, stat_info.st_ino)
+        if stat_info.st_size < min_size or inode in seen_inodes:
+            continue
+        seen_inodes.add(inode)
+        by_size.setdefault(stat_info.st_size, []).append((Path(entry.path), stat_info))
+
+    candidates = [file for files in by_size.values() if len(files) > 1 for file in files]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fsnek-dupes") as executor:
+        groups = []
+        full_candidates = []
+        for group in _group_by_hash(executor, partial_hash, candidates, is_cancelled):
+            if group[0][1].st_size > 2 * PARTIAL_BLOCK_SIZE:
+                full_candidates.extend(group)
+            else:
+                groups.append(group)
+        if is_cancelled():
+            return []
+        groups.extend(_group_by_hash(executor, file_hash, full_candidates, is_cancelled))
+        if is_cancelled():
+            return []
+
+    groups.sort(key=lambda group: group[0][1].st_size * (len(group) - 1), reverse=True)
+    return [sorted(path for path, _ in group) for group in groups]
+
+
+def reclaimable_bytes(groups: list[list[Path]]) -> int:
+    """Return how many bytes deleting all but one file of each group would free."""
+    total = 0
+    for group in groups:
+        try:
+            total += group[0].stat().st_size * (len(group) - 1)
+        except OSError:
+            pass
+    return total
@@ -0,0 +1,301 @@
+import os
+import stat
+import shutil
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from listing import human_readable_size
+from archives import extract_member, split_archive_path
+from concurrent.futures import ThreadPoolExecutor
+
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_WORKERS = 8
+
+
+@dataclass
+class SyncReport:
+    copied_files: int = 0
+    copied_bytes: int = 0
+    skipped_files: int = 0
+    skipped_bytes: int = 0
+    errors: list[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"Copied {self.copied_files} files ({human_readable_size(self.copied_bytes)}), "
+            f"skipped {self.skipped_files} unchanged ({human_readable_size(self.skipped_bytes)})"
+        )
+
+
+def unique_destination(item: Path, directory: Path) -> Path:
+    """Return `directory / item.name`, or the first free `name (n).ext` variant of it."""
+    stem = item.stem
+    suffix = item.suffix
+    j = 1
+    destination = directory / item.name
+
+    while destination.exists():
+        new_name = f"{stem} ({j}){suffix}"
+        destination = directory / new_name
+        j += 1
+
+    return destination
+
+
+def copy_item(item: Path, directory: Path) -> Path:
+    destination = unique_destination(item, directory)
+    archive_location = split_archive_path(item)
+    if archive_location is not None and archive_location[1]:
+        # a member of an archive, not the archive itself
+        return extract_member(*archive_location, destination)
+    if item.is_dir():
+        shutil.copytree(item, destination)
+    else:
+        shutil.copy2(item, destination)
+    return destination
+
+
+def move_item(item: Path, directory: Path) -> Path:
+    # raises shutil.Error (an OSError) if `directory` already has an item with the same name
+    return Path(shutil.move(str(item), directory))
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "fsnek"
+
+
+class HashCache:
+    """Content hashes keyed by (path, size, mtime), kept in memory and in a SQLite file.
+
+    The file lets separate runs, e.g. repeated `fsnek put --sync --checksum`,
+    reuse each other's hashes. If it can't be opened the cache is memory-only.
+    """
+
+    def __init__(self, file: Path):
+        self.file = file
+        self.memory: dict[tuple[str, int, int], str] = {}
+        self.lock = threading.Lock()
+        self.db: sqlite3.Connection | None = None
+        self.opened = False
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if not self.opened:
+            self.opened = True
+            try:
+                self.file.parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(self.file, timeout=5, check_same_thread=False)
+                # it's only a cache, losing the last writes on a crash is fine
+                db.execute("PRAGMA synchronous = OFF")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS hashes "
+                    "(path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, digest TEXT)"
+                )
+                self.db = db
+            except (OSError, sqlite3.Error):
+                self.db = None
+        return self.db
+
+    def get(self, path: str, size: int, mtime_ns: int) -> str | None:
+        key = (path, size, mtime_ns)
+        with self.lock:
+            if key in self.memory:
+                return self.memory[key]
+            db = self._connect()
+            if db is None:
+                return None
+            try:
+                row = db.execute(
+                    "SELECT digest FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ?", key
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is not None:
+                self.memory[key] = row[0]
+                return row[0]
+            return None
+
+    def put(self, path: str, size: int, mtime_ns: int, digest: str) -> None:
+        with self.lock:
+            self.memory[(path, size, mtime_ns)] = digest
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?)", (path, size, mtime_ns, digest)
+                )
+                db.commit()
+            except sqlite3.Error:
+                pass
+
+
+_hash_cache: HashCache | None = None
+
+
+def hash_cache() -> HashCache:
+    global _hash_cache
+    if _hash_cache is None:
+        _hash_cache = HashCache(cache_dir() / "hashes.sqlite3")
+    return _hash_cache
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_hash(path: Path, stat_info: os.stat_result | None = None) -> str:
+    """Return the content hash of `path`, cached across runs per (path, size, mtime)."""
+    if stat_info is None:
+        stat_info = path.stat()
+    # size and mtime are part of the key, so a modified file gets hashed again
+    key = (os.path.abspath(path), stat_info.st_size, stat_info.st_mtime_ns)
+    cache = hash_cache()
+    digest = cache.get(*key)
+    if digest is None:
+        digest = _hash_file(key[0])
+        cache.put(*key, digest)
+    return digest
+
+
+def _same_content(pair: tuple[Path, Path, os.stat_result, os.stat_result]) -> bool:
+    source, destination, source_stat, destination_stat = pair
+    try:
+        return file_hash(source, source_stat) == file_hash(destination, destination_stat)
+    except OSError:
+        return False
+
+
+def _sync_symlink(source: Path, target: Path, report: SyncReport) -> None:
+    link = os.readlink(source)
+    if target.is_symlink() and os.readlink(target) == link:
+        report.skipped_files += 1
+    elif os.path.lexists(target):
+        report.errors.append(f"Cannot replace {target} with a symlink")
+    else:
+        os.symlink(link, target)
+        report.copied_files += 1
+
+
+def _sync_pairs(item: Path, destination: Path, report: SyncReport) -> list[tuple[Path, Path]]:
+    if not item.is_dir():
+        return [(item, destination)]
+
+    pairs = []
+    # directories that can't be listed count as errors, so a sync-move keeps its source
+    for root, dirnames, filenames in os.walk(item, onerror=lambda e: report.errors.append(str(e))):
+        target_root = destination / os.path.relpath(root, item)
+        try:
+            target_root.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            report.errors.append(str(e))
+            continue
+        # symlinks are recreated as symlinks instead of copying (or looping through) what they point to
+        for name in filenames:
+            source = Path(root) / name
+            if source.is_symlink():
+                try:
+                    _sync_symlink(source, target_root / name, report)
+                except OSError as e:
+                    report.errors.append(str(e))
+            else:
+                pairs.append((source, target_root / name))
+        for name in dirnames:
+            source = Path(root) / name
+            if source.is_symlink():
+                try:
+                    _sync_symlink(source, target_root / name, report)
+                except OSError as e:
+                    report.errors.append(str(e))
+    return pairs
+
+
+def sync_item(
+    item: Path,
+    directory: Path,
+    checksum: bool = False,
+    move: bool = False,
+    report: SyncReport | None = None,
+) -> SyncReport:
+    """Copy `item` into `directory`, skipping files the destination already has.
+
+    A file counts as unchanged when the destination has the same size and
+    modification time (to the second), or, with `checksum`, the same size
+    and content hash. Hashes are computed in a thread pool. With `move` the
+    source is removed once everything has been synced without errors.
+    Counts are added to `report` when one is passed in.
+    """
+    archive_location = split_archive_path(item)
+    if archive_location is not None and archive_location[1]:
+        raise shutil.Error(f"Cannot sync {item.name}: archive members can only be copied with a normal put")
+
+    destination = directory / item.name
+    if destination.resolve() == item.resolve():
+        raise shutil.Error(f"{item} is already in {directory}")
+    if item.is_dir() and directory.resolve().is_relative_to(item.resolve()):
+        raise shutil.Error(f"Cannot sync {item} into itself")
+
+    if report is None:
+        report = SyncReport()
+    errors_before = len(report.errors)
+    to_copy = []
+    to_compare = []
+
+    for source, target in _sync_pairs(item, destination, report):
+        try:
+            source_stat = source.stat()
+        except OSError as e:
+            report.errors.append(str(e))
+            continue
+        try:
+            target_stat = target.stat()
+        except FileNotFoundError:
+            to_copy.append((source, target, source_stat))
+            continue
+        except OSError as e:
+            report.errors.append(str(e))
+            continue
+
+        if stat.S_ISDIR(target_stat.st_mode):
+            report.errors.append(f"Cannot overwrite directory {target} with a file")
+        elif source_stat.st_size != target_stat.st_size:
+            to_copy.append((source, target, source_stat))
+        elif checksum:
+            to_compare.append((source, target, source_stat, target_stat))
+        elif int(source_stat.st_mtime) == int(target_stat.st_mtime):
+            report.skipped_files += 1
+            report.skipped_bytes += source_stat.st_size
+        else:
+            to_copy.append((source, target, source_stat))
+
+    if to_compare:
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="fsnek-hash") as executor:
+            for pair, same in zip(to_compare, executor.map(_same_content, to_compare)):
+                source, target, source_stat, _ = pair
+                if same:
+                    report.skipped_files += 1
+                    report.skipped_bytes += source_stat.st_size
+                else:
+                    to_copy.append((source, target, source_stat))
+
+    for source, target, source_stat in to_copy:
+        try:
+            shutil.copy2(source, target)
+        except OSError as e:
+            report.errors.append(str(e))
+        else:
+            report.copied_files += 1
+            report.copied_bytes += source_stat.st_size
+
+    if move and len(report.errors) == errors_before:
+        if item.is_dir() and not item.is_symlink():
+            shutil.rmtree(item)
+        else:
+            item.unlink()
+
+    return report
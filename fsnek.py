@@ -1,12 +1,29 @@
+import os
 import sys
-import shutil
+import time
 import pyperclipimg
 from PIL import Image
 from icons import ICONS
+from archives import (
+    ArchiveMember,
+    cached_archive_index,
+    is_archive_directory,
+    list_archive,
+    split_archive_path,
+)
+from duplicates import find_duplicates, reclaimable_bytes
+from fileops import SyncReport, copy_item, move_item, sync_item
+from listing import (
+    format_timestamp,
+    human_readable_size,
+    is_network_filesystem,
+    list_directory,
+    stat_concurrently,
+)
 from typing import Literal
 from pathlib import Path
-from datetime import datetime
 from send2trash import send2trash as trash
+from textual import work
 from textual.app import App, ComposeResult
 from textual.events import Key
 from textual.binding import Binding
@@ -14,6 +31,7 @@ from textual.widgets import DataTable, Footer, Input, Static
 from textual.containers import Container
 from textual.coordinate import Coordinate
 from textual.widgets.data_table import RowKey
+from textual.worker import get_current_worker
 
 
 class FileTable(DataTable):
@@ -49,11 +67,14 @@ class FileTable(DataTable):
         Binding("yy",        "yank",                 "yank",           show=True),
         Binding("y",         "yank",                 "yank",           show=False),
         Binding("p",         "put",                  "put",            show=True),
+        Binding("P",         "put(True)",            "sync put",       show=False),
+        Binding("S",         "put(True, True)",      "checksum sync",  show=False),
+        Binding("D",         "find_duplicates",      "duplicates",     show=False),
     ]
     MAX_COLUMN_WIDTH = 20
 
     if len(sys.argv) > 1:
-        if Path(sys.argv[1]).is_dir():
+        if Path(sys.argv[1]).is_dir() or is_archive_directory(Path(sys.argv[1])):
             current_path = Path(sys.argv[1])
         else:
             current_path = Path(HOME_DIR)
@@ -73,9 +94,21 @@ class FileTable(DataTable):
     visual_mode = False
     visual_start_row = 0
     visual_end_row = 0
+    visual_range = range(0)
 
     tap_count = 0
 
+    # None picks the concurrent stat pipeline automatically for network filesystems
+    concurrent_stat: bool | None = None
+    listing_generation = 0
+    # set while an archive's index is read in the background and only a placeholder row is shown
+    loading_archive = False
+    # set while the duplicate finder's results are shown instead of current_path's contents
+    duplicate_groups: list[list[Path]] | None = None
+    duplicate_root: Path | None = None
+    # row key -> index of its group in duplicate_groups, for the rows currently shown
+    duplicate_row_groups: dict[str, int] = {}
+
     def compose(self) -> ComposeResult:
         yield DataTable()
 
@@ -86,77 +119,204 @@ class FileTable(DataTable):
         # COLUMNS
         self.add_column("")
         self.add_column("Name", width=self.MAX_COLUMN_WIDTH)
-        self.add_column("Size", width=7) # 7 character max width e.g. 1023.4K
-        self.add_column("Last Modified")
+        self.add_column("Size", width=7, key="size") # 7 character max width e.g. 1023.4K
+        self.add_column("Last Modified", key="modified")
         self.add_column("Full name", width=0)
 
         self.refresh_table()
 
+    def assign_icon(self, entry: os.DirEntry | ArchiveMember) -> str:
+        if entry.is_dir():
+            return ICONS["directory"]
+
+        extension = Path(entry.name).suffix[1:].lower()
+        return ICONS.get(extension, ICONS["generic_file"])
+
+    def display_name(self, entry: os.DirEntry | ArchiveMember) -> str:
+        name_limit = self.MAX_COLUMN_WIDTH - 3
+        if len(entry.name) > name_limit:
+            return f"{entry.name[:name_limit]}..."
+        return entry.name
+
     def refresh_table(self) -> None:
         self.current_rows = 0
+        self.listing_generation += 1
+        self.loading_archive = False
+        self.workers.cancel_group(self, "stat")
+        self.workers.cancel_group(self, "archive")
 
-        def assign_icon(path: Path) -> str:
-            if path.is_dir():
-                return ICONS["directory"]
+        # resolve the queued items' parents once instead of resolving every listed entry
+        hidden_items = {p.parent.resolve() / p.name for p in self.item_queue}
+        resolved_path = self.current_path.resolve() if hidden_items else self.current_path
 
-            extension = path.suffix[1:].lower()
-            return ICONS.get(extension, ICONS["generic_file"])
+        def is_hidden(entry: os.DirEntry) -> bool:
+            return bool(hidden_items) and resolved_path / entry.name in hidden_items
 
-        def human_readable_size(size: float, decimal_places: int = 1):
-            unit = 'B'
-            for unit in ['B', 'K', 'M', 'G', 'T', 'P']:
-                if size < 1024.0 and unit == 'B':
-                    return f"{size}{unit}"
-                if size < 1024.0 or unit == 'P':
-                    break
-                size /= 1024.0
-            return f"{size:.{decimal_places}f}{unit}"
-
-        def add_to_filetable(item: Path) -> None:
+        def add_to_filetable(item: os.DirEntry) -> None:
             try:
                 stat_info = item.stat()
-                lm_timestamp = stat_info.st_mtime
-                lm_time = datetime.fromtimestamp(lm_timestamp).strftime(
-                    "%Y-%m-%d %H:%M:%S"
-                )
+                lm_time = format_timestamp(stat_info.st_mtime)
                 size = human_readable_size(stat_info.st_size)
 
-                name_limit = self.MAX_COLUMN_WIDTH - 3
-                if len(item.name) > name_limit:
-                    display_name = f"{item.name[:name_limit]}..."
-                else:
-                    display_name = item.name
-
-                if Path(f"{self.current_path}/{item.name}").resolve() not in [p.resolve() for p in self.item_queue]:
+                if not is_hidden(item):
                     self.add_row(
-                        assign_icon(item),
-                        display_name,
+                        self.assign_icon(item),
+                        self.display_name(item),
                         size,
                         lm_time,
                         item.name,
+                        key=item.name,
                     )
 
                 self.current_rows += 1
 
             except FileNotFoundError:
-                self.add_row(assign_icon(item), item.name, "Unknown", "Unknown")
+                self.add_row(self.assign_icon(item), item.name, "Unknown", "Unknown")
 
         self.clear()
 
-        files = []
-        directories = []
-        all_items = []
+        if self.duplicate_groups is not None:
+            name_limit = self.MAX_COLUMN_WIDTH - 3
+            self.duplicate_row_groups = {}
+            pending = {}
+            group_number = 0
+            for group_index, group in enumerate(self.duplicate_groups):
+                # files queued for deleting or moving no longer count
+                remaining = [
+                    path for path in group
+                    if not (hidden_items and path.parent.resolve() / path.name in hidden_items)
+                ]
+                if len(remaining) < 2:
+                    continue
+                group_number += 1
+                for path in remaining:
+                    relative_name = str(path.relative_to(self.duplicate_root))
+                    if len(relative_name) > name_limit:
+                        shown_name = f"...{relative_name[-name_limit:]}"
+                    else:
+                        shown_name = relative_name
+                    # the group number in front of the icon shows which files are copies of each other
+                    self.add_row(
+                        f"{group_number} {ICONS.get(path.suffix[1:].lower(), ICONS['generic_file'])}",
+                        shown_name,
+                        "...",
+                        "...",
+                        relative_name,
+                        key=relative_name,
+                    )
+                    self.duplicate_row_groups[relative_name] = group_index
+                    pending[relative_name] = path
+                    self.current_rows += 1
+            self.fill_stat_columns(pending, self.listing_generation)
+            return
 
-        for directory in self.current_path.iterdir():
-            if directory.name[0] != "." and directory.is_dir():
-                directories.append(directory)
-        for file in self.current_path.iterdir():
-            if file.name[0] != "." and not file.is_dir():
-                files.append(file)
+        archive_location = split_archive_path(self.current_path)
+        if archive_location is not None:
+            if cached_archive_index(archive_location[0]) is None:
+                # reading the index of a big or compressed archive can take a while
+                self.loading_archive = True
+                self.add_row("", "Loading archive...", "", "", "")
+                self.load_archive(*archive_location, self.listing_generation)
+                return
 
-        all_items = sorted(directories) + sorted(files)
-        for item in all_items:
-            add_to_filetable(item)
+            # archive members come from the cached index, no stat calls needed
+            self.add_archive_members(list_archive(*archive_location))
+            return
+
+        all_items = list_directory(self.current_path)
+
+        if self.concurrent_stat is None:
+            concurrent = is_network_filesystem(self.current_path)
+        else:
+            concurrent = self.concurrent_stat
+
+        if concurrent:
+            # names first, sizes and dates are filled in as the stat calls come back
+            pending = {}
+            for item in all_items:
+                if not is_hidden(item):
+                    self.add_row(self.assign_icon(item), self.display_name(item), "...", "...", item.name, key=item.name)
+                    pending[item.name] = item
+                self.current_rows += 1
+            self.fill_stat_columns(pending, self.listing_generation)
+        else:
+            for item in all_items:
+                add_to_filetable(item)
+
+    def add_archive_members(self, members: list[ArchiveMember]) -> None:
+        for member in members:
+            self.add_row(
+                self.assign_icon(member),
+                self.display_name(member),
+                human_readable_size(member.size),
+                format_timestamp(member.mtime),
+                member.name,
+                key=member.name,
+            )
+            self.current_rows += 1
+
+    @work(thread=True, exclusive=True, group="archive")
+    def load_archive(self, archive: Path, inner: str, generation: int) -> None:
+        try:
+            members = list_archive(archive, inner)
+        except OSError as e:
+            if not get_current_worker().is_cancelled:
+                self.app.call_from_thread(self.archive_load_failed, archive, e, generation)
+            return
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.show_archive_members, members, generation)
+
+    def show_archive_members(self, members: list[ArchiveMember], generation: int) -> None:
+        if generation != self.listing_generation:
+            return
+        self.loading_archive = False
+        self.clear()
+        self.add_archive_members(members)
+
+    def archive_load_failed(self, archive: Path, error: OSError, generation: int) -> None:
+        if generation != self.listing_generation:
+            return
+        self.notify(f"Cannot open {archive.name}: {error}", severity="error", timeout=5)
+        # fall back to the directory holding the archive, also when fsnek was started on it
+        self.current_path = archive.parent
+        self.turn_visual_mode_off()
+        self.refresh_table()
+        if self.last_cursor_positions:
+            self.move_cursor(row=self.last_cursor_positions.pop())
+
+    @work(thread=True, exclusive=True, group="stat")
+    def fill_stat_columns(self, rows: dict[str, os.DirEntry | Path], generation: int) -> None:
+        worker = get_current_worker()
+        row_keys = {entry: key for key, entry in rows.items()}
+        batch = []
+        last_flush = time.monotonic()
+
+        for entry, stat_info in stat_concurrently(list(rows.values())):
+            if worker.is_cancelled:
+                return
+            batch.append((row_keys[entry], stat_info))
+            if len(batch) >= 64 or time.monotonic() - last_flush > 0.1:
+                self.app.call_from_thread(self.update_stat_columns, batch, generation)
+                batch = []
+                last_flush = time.monotonic()
+
+        if batch and not worker.is_cancelled:
+            self.app.call_from_thread(self.update_stat_columns, batch, generation)
+
+    def update_stat_columns(self, results: list[tuple[str, os.stat_result | None]], generation: int) -> None:
+        if generation != self.listing_generation:
+            return
+
+        for key, stat_info in results:
+            if key not in self.rows:
+                continue
+            if stat_info is None:
+                size, lm_time = "Unknown", "Unknown"
+            else:
+                size = human_readable_size(stat_info.st_size)
+                lm_time = format_timestamp(stat_info.st_mtime)
+            self.update_cell(key, "size", size)
+            self.update_cell(key, "modified", lm_time)
 
     def _should_highlight(
         self,
@@ -164,34 +324,55 @@ class FileTable(DataTable):
         target_cell: Coordinate,
         type_of_cursor=Literal["cell", "row", "column", "none"],
     ) -> bool:
-        if self.visual_mode:
-            target_row, _ = target_cell
-            start = min(self.visual_start_row, self.visual_end_row)
-            end = max(self.visual_start_row, self.visual_end_row)
-            if start <= target_row <= end:
-                return True
-        
+        if self.visual_mode and target_cell.row in self.visual_range:
+            return True
+
         return super()._should_highlight(cursor, target_cell, type_of_cursor)
 
     def watch_cursor_coordinate(self, old_coordinate: Coordinate, new_coordinate: Coordinate) -> None:
         super().watch_cursor_coordinate(old_coordinate, new_coordinate)
         if self.visual_mode:
             self.visual_end_row = new_coordinate.row
-            self.refresh()
+            self.update_visual_range()
+            self.refresh_rows_between(old_coordinate.row, new_coordinate.row)
+
+    def update_visual_range(self) -> None:
+        start = min(self.visual_start_row, self.visual_end_row)
+        end = max(self.visual_start_row, self.visual_end_row)
+        self.visual_range = range(start, end + 1)
+
+    def refresh_rows_between(self, first_row: int, last_row: int) -> None:
+        # only rows between the old and new cursor can enter or leave the visual range,
+        # and the cursor rows themselves are already refreshed by DataTable
+        if abs(first_row - last_row) <= 1:
+            return
+        top = max(0, min(first_row, last_row))
+        bottom = min(self.row_count - 1, max(first_row, last_row))
+        region = self._get_row_region(top).union(self._get_row_region(bottom))
+        self._refresh_region(region)
 
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         self.selected_row_keys.clear()
+        if self.duplicate_groups is not None:
+            # rows are relative to the search root, so the view can't navigate away from it
+            self.notify("Cannot open items from the duplicates view: press Backspace to return first", severity="error", timeout=5)
+            return
+        if self.loading_archive:
+            return
         selected_row = self.get_row_at(event.cursor_row)[4]
         new_path = Path(f"{self.current_path}/{selected_row}")
         previous_path = self.current_path
-        if new_path.is_dir():
+        if new_path.is_dir() or is_archive_directory(new_path):
             try:
                 self.current_path = new_path
                 self.last_cursor_positions.append(event.cursor_row)
                 self.refresh_table()
-            except PermissionError:
+            except OSError as e:
                 self.current_path = previous_path
-                self.notify("Cannot access directory: Permission denied", severity="error", timeout=5)
+                if isinstance(e, PermissionError):
+                    self.notify("Cannot access directory: Permission denied", severity="error", timeout=5)
+                else:
+                    self.notify(f"Cannot open {new_path.name}: {e}", severity="error", timeout=5)
                 self.refresh_table()
                 self.move_cursor(row=self.last_cursor_positions[-1])
                 self.last_cursor_positions.pop()
@@ -206,6 +387,16 @@ class FileTable(DataTable):
 
     def action_go_back(self) -> None:
         self.selected_row_keys.clear()
+        if self.duplicate_groups is not None:
+            self.duplicate_groups = None
+            self.duplicate_root = None
+            self.turn_visual_mode_off()
+            self.refresh_table()
+            if self.last_cursor_positions:
+                self.move_cursor(row=self.last_cursor_positions[-1])
+                self.last_cursor_positions.pop()
+            return
+
         new_path = Path(f"{self.current_path.parent.absolute()}")
         if self.current_path != self.HOME_DIR:
             self.current_path = new_path
@@ -222,7 +413,7 @@ class FileTable(DataTable):
             self.visual_mode = True
             self.visual_start_row = self.cursor_row
             self.visual_end_row = self.cursor_row
-            self.selected_row_keys.append(self.current_row_key)
+            self.update_visual_range()
             self.add_class("visual-mode")
         else:
             self.turn_visual_mode_off()
@@ -326,36 +517,63 @@ class FileTable(DataTable):
         if self.current_row_key is None:
             return
 
-        if self.current_row_key not in self.selected_row_keys:
-            self.selected_row_keys.append(self.current_row_key)
-        if self.visual_start_row < self.visual_end_row:
-            start = self.visual_start_row
-            end = self.visual_end_row
-        else:
-            start = self.visual_end_row
-            end = self.visual_start_row
-
-        for row_idx in range(start, end + 1):
-            if self.ordered_rows[row_idx].key not in self.selected_row_keys:
-                self.selected_row_keys.append(self.ordered_rows[row_idx].key)
+        ordered_rows = self.ordered_rows
+        self.selected_row_keys.extend(ordered_rows[row_idx].key for row_idx in self.visual_range)
 
         for row_key in self.selected_row_keys:
+            item = Path(f"{self.current_path}/{self.get_row(row_key)[4]}")
             if not yanking:
-                self.item_queue.append(Path(f"{self.current_path}/{self.get_row(row_key)[4]}"))
-                self.remove_row(row_key)
+                self.item_queue.append(item)
             else:
-                self.yanking_queue.append(Path(f"{self.current_path}/{self.get_row(row_key)[4]}"))
+                self.yanking_queue.append(item)
 
         self.turn_visual_mode_off()
         self.selected_row_keys.clear()
         self.tap_count = 0
 
+    def inside_archive(self) -> bool:
+        if split_archive_path(self.current_path) is None:
+            return False
+        self.notify("Cannot modify an archive: Archives are read-only", severity="error", timeout=5)
+        return True
+
+    def inside_duplicates_view(self) -> bool:
+        if self.duplicate_groups is None:
+            return False
+        self.notify("Cannot do that in the duplicates view: only deleting is supported, press Backspace to return first", severity="error", timeout=5)
+        return True
+
+    def deletes_every_copy(self, items: list[Path]) -> bool:
+        """Return True if deleting `items` would leave a group in the duplicates view without any file."""
+        if self.duplicate_groups is None:
+            return False
+        queued = {os.path.relpath(item, self.duplicate_root) for item in items}
+        deleted_from = {group for key, group in self.duplicate_row_groups.items() if key in queued}
+        kept_in = {group for key, group in self.duplicate_row_groups.items() if key not in queued}
+        return bool(deleted_from - kept_in)
+
+    def forget_duplicates(self, deleted: list[Path]) -> None:
+        # drops deleted files from the results, so the view doesn't have to check every file again
+        if self.duplicate_groups is None:
+            return
+        deleted = set(deleted)
+        self.duplicate_groups = [[path for path in group if path not in deleted] for group in self.duplicate_groups]
+
     def action_delete(self) -> None:
+        if self.inside_archive():
+            return
+
         if self.visual_mode:
             if self.moving:
                 self.show_dialog("CANCEL")
             else:
                 self.get_visual_mode_selection()
+                if self.deletes_every_copy(self.item_queue):
+                    self.notify("Cannot delete every copy of a duplicate file: keep at least one file of each group", severity="error", timeout=5)
+                    self.item_queue.clear()
+                    return
+                # hides the queued items in one pass instead of removing rows one by one
+                self.refresh_table()
                 self.show_dialog("DELETE")
     
         elif self.is_double_tap():
@@ -371,6 +589,9 @@ class FileTable(DataTable):
             self.item_queue.clear()
 
     def action_move(self) -> None:
+        if self.inside_archive() or self.inside_duplicates_view():
+            return
+
         self.moving = True
         if self.visual_mode:
             self.get_visual_mode_selection()
@@ -383,32 +604,90 @@ class FileTable(DataTable):
             self.refresh_table()
             self.move_cursor(row=self.current_row_idx)
 
-    def action_put(self) -> None:
+    def action_put(self, sync: bool = False, checksum: bool = False) -> None:
+        if self.inside_archive() or self.inside_duplicates_view():
+            return
+
         if self.moving:
-            self.show_dialog("MOVE")
+            if sync:
+                self.show_dialog("SYNC", checksum=checksum)
+            else:
+                self.show_dialog("MOVE")
+        elif sync:
+            self.sync_items(list(self.yanking_queue), self.current_path, checksum=checksum)
         else:
-            for item in self.yanking_queue:
-                stem = item.stem
-                suffix = item.suffix
-                j = 1
-                destination = self.current_path / item.name
-                
-                while destination.exists():
-                    new_name = f"{stem} ({j}){suffix}"
-                    destination = self.current_path / new_name
-                    j += 1
-                
-                if item.is_dir():
-                    try:
-                        shutil.copytree(item, destination)
-                    except Exception as e:
-                        self.notify(f"Error copying {item.name}: {str(e)}", severity="error", timeout=5)
-                else:
-                    try:
-                        shutil.copy2(item, destination)
-                    except Exception as e:
-                        self.notify(f"Error copying {item.name}: {str(e)}", severity="error", timeout=5)
+            self.copy_items(list(self.yanking_queue), self.current_path)
+        self.refresh_table()
+
+    @work(thread=True, group="put")
+    def copy_items(self, items: list[Path], directory: Path) -> None:
+        # extracting from an archive or copying a big tree shouldn't freeze the UI
+        for item in items:
+            try:
+                copy_item(item, directory)
+            except Exception as e:
+                self.app.call_from_thread(self.notify, f"Error copying {item.name}: {str(e)}", severity="error", timeout=5)
+        self.app.call_from_thread(self.finish_copy, directory)
+
+    def finish_copy(self, directory: Path) -> None:
+        if directory == self.current_path and self.duplicate_groups is None:
+            self.refresh_table()
+
+    @work(thread=True, group="sync")
+    def sync_items(self, items: list[Path], directory: Path, checksum: bool = False, move: bool = False) -> None:
+        self.app.call_from_thread(self.notify, f"Syncing {len(items)} item(s) into {directory}...", timeout=5)
+        report = SyncReport()
+        for item in items:
+            try:
+                sync_item(item, directory, checksum=checksum, move=move, report=report)
+            except OSError as e:
+                report.errors.append(f"{item.name}: {e}")
+        self.app.call_from_thread(self.finish_sync, report)
+
+    def finish_sync(self, report: SyncReport) -> None:
+        self.notify_sync_report(report)
+        self.refresh_table()
+
+    def notify_sync_report(self, report: SyncReport) -> None:
+        for error in report.errors:
+            self.notify(f"Error syncing: {error}", severity="error", timeout=5)
+        self.notify(report.summary(), timeout=5)
+
+    def action_find_duplicates(self) -> None:
+        if self.duplicate_groups is not None:
+            return
+        if split_archive_path(self.current_path) is not None:
+            self.notify("Cannot search for duplicates inside an archive", severity="error", timeout=5)
+            return
+
+        self.notify(f"Searching for duplicate files in {self.current_path}...", timeout=5)
+        self.search_duplicates(self.current_path)
+
+    @work(thread=True, exclusive=True, group="duplicates")
+    def search_duplicates(self, root: Path) -> None:
+        worker = get_current_worker()
+        groups = find_duplicates(root, is_cancelled=lambda: worker.is_cancelled)
+        reclaimable = reclaimable_bytes(groups)
+        if not worker.is_cancelled:
+            self.app.call_from_thread(self.show_duplicates, root, groups, reclaimable)
+
+    def show_duplicates(self, root: Path, groups: list[list[Path]], reclaimable: int) -> None:
+        if root != self.current_path or self.duplicate_groups is not None:
+            return
+        if not groups:
+            self.notify("No duplicate files found", timeout=5)
+            return
+
+        self.duplicate_groups = groups
+        self.duplicate_root = root
+        self.last_cursor_positions.append(self.current_row_idx)
+        self.turn_visual_mode_off()
         self.refresh_table()
+        self.move_cursor(row=0)
+        self.notify(
+            f"Found {len(groups)} groups of duplicate files, {human_readable_size(reclaimable)} reclaimable",
+            timeout=5,
+        )
 
     def action_escape_pressed(self) -> None:
         if self.visual_mode and self.moving:
@@ -422,17 +701,18 @@ class FileTable(DataTable):
             self.notify("Move canceled", severity="warning", timeout=5)
         self.move_cursor(row=self.current_row_idx)
 
-    def show_dialog(self, command: str) -> None:
+    def show_dialog(self, command: str, checksum: bool = False) -> None:
         overlay = self.app.query_one(Overlay)
         overlay.styles.display = "block"
         dialog = self.app.query_one(DialogBox)
         dialog.styles.display = "block"
         dialog.command = f"{command}"
+        dialog.checksum = checksum
 
         output = ""
         pending_actions = ""
 
-        if command in ("DELETE", "MOVE"):
+        if command in ("DELETE", "MOVE", "SYNC"):
             for item in self.item_queue:
                 pending_actions = pending_actions + "\n" + str(item)
                 output = output + f"{str(item)}\n"
@@ -449,6 +729,9 @@ class FileTable(DataTable):
             dialog.focus()
 
     def action_rename(self, insert: bool = False, append_at_end: bool = False) -> None:
+        if self.inside_archive() or self.inside_duplicates_view():
+            return
+
         if self.current_rows < 1:
             self.notify("Nothing to rename", severity="error", timeout=5)
         else:
@@ -479,6 +762,9 @@ class FileTable(DataTable):
                 input_box.action_exit()
 
     def action_create_file(self) -> None:
+        if self.inside_archive() or self.inside_duplicates_view():
+            return
+
         overlay = self.app.query_one(Overlay)
         overlay.styles.display = "block"
         input_box = self.app.query_one(InputBox)
@@ -523,11 +809,13 @@ class DialogBox(Static, can_focus=True):
 
     actions = ""
     command = ""
+    checksum = False
 
     def close_dialog(self) -> None:
         file_table = self.app.query_one(FileTable)
         self.actions = ""
         self.command = ""
+        self.checksum = False
         self.styles.display = "none"
         file_table.refresh_table()
         file_table.move_cursor(row=file_table.current_row_idx)
@@ -545,6 +833,8 @@ class DialogBox(Static, can_focus=True):
             self.cancel_move()
         elif self.command == "MOVE":
             self.move_files()
+        elif self.command == "SYNC":
+            self.move_files(sync=True)
 
         file_table.item_queue.clear()
         self.close_dialog()
@@ -557,18 +847,28 @@ class DialogBox(Static, can_focus=True):
 
     def delete_files(self) -> None:
         self.actions = str(self.actions).split("\n")
+        deleted = []
         for item in self.actions:
             try:
                 trash(item)
+                deleted.append(Path(item))
             except Exception as e:
                 self.notify(f"Unexpected error occured: {e}", severity="error", timeout=5)
+        self.app.query_one(FileTable).forget_duplicates(deleted)
 
-    def move_files(self) -> None:
+    def move_files(self, sync: bool = False) -> None:
         file_table = self.app.query_one(FileTable)
         self.actions = str(self.actions).split("\n")
+        if sync:
+            items = [Path(item) for item in self.actions]
+            file_table.sync_items(items, file_table.current_path, checksum=self.checksum, move=True)
+            file_table.moving = False
+            file_table.refresh_table()
+            return
+
         for item in self.actions:
             try:
-                shutil.move(item, file_table.current_path)
+                move_item(Path(item), file_table.current_path)
             except OSError:
                 formatted_item = item.split("/")[-1]
                 formatted_path = f"{file_table.current_path.name}"
@@ -0,0 +1,255 @@
+import os
+import time
+import queue
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, wait
+
+# Filesystem types (as reported in /proc/mounts) where every stat() is a
+# round trip to another machine.
+NETWORK_FS_TYPES = frozenset({
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "9p",
+    "afs",
+    "ceph",
+    "glusterfs",
+    "lustre",
+    "davfs",
+    "fuse.sshfs",
+    "fuse.rclone",
+    "fuse.s3fs",
+    "fuse.gcsfuse",
+    "fuse.glusterfs",
+    "fuse.davfs2",
+})
+
+STAT_WORKERS = 16
+STAT_TIMEOUT = 5.0
+
+
+def human_readable_size(size: float, decimal_places: int = 1):
+    unit = 'B'
+    for unit in ['B', 'K', 'M', 'G', 'T', 'P']:
+        if size < 1024.0 and unit == 'B':
+            return f"{size}{unit}"
+        if size < 1024.0 or unit == 'P':
+            break
+        size /= 1024.0
+    return f"{size:.{decimal_places}f}{unit}"
+
+
+def format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_directory(path: Path) -> Iterator[os.DirEntry]:
+    """Yield the visible entries of `path` in the order the filesystem returns them."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name[0] != ".":
+                yield entry
+
+
+def entry_is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def list_directory(path: Path) -> list[os.DirEntry]:
+    """Return the visible entries of `path`, directories first, each group sorted by name.
+
+    Uses `os.scandir` so the directory/file split comes from the directory
+    listing itself instead of one `stat()` per entry.
+    """
+    directories = []
+    files = []
+    for entry in iter_directory(path):
+        if entry_is_dir(entry):
+            directories.append(entry)
+        else:
+            files.append(entry)
+
+    directories.sort(key=lambda entry: entry.name)
+    files.sort(key=lambda entry: entry.name)
+    return directories + files
+
+
+def walk_directory(
+    root: Path, onerror: Callable[[OSError], None] | None = None
+) -> Iterator[os.DirEntry]:
+    """Yield every visible entry below `root`, one directory at a time in `list_directory` order.
+
+    Only one directory listing is held at a time; symlinked directories are
+    listed but not descended into. Directories that can't be listed are
+    skipped, passing the error to `onerror` if given.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = list_directory(directory)
+        except OSError as e:
+            if onerror is not None:
+                onerror(e)
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            yield entry
+            if entry_is_dir(entry) and not entry.is_symlink():
+                subdirectories.append(Path(entry.path))
+        stack.extend(reversed(subdirectories))
+
+
+def _unescape_mount_field(field: str) -> str:
+    # /proc/mounts encodes spaces, tabs, newlines and backslashes as octal escapes
+    for escaped, char in (("\\040", " "), ("\\011", "\t"), ("\\012", "\n"), ("\\134", "\\")):
+        field = field.replace(escaped, char)
+    return field
+
+
+def find_mount(path: Path, mounts_file: Path = Path("/proc/mounts")) -> tuple[str, str] | None:
+    """Return `(mount point, filesystem type)` for the mount `path` lives on, or None if unknown."""
+    try:
+        lines = mounts_file.read_text().splitlines()
+    except OSError:
+        return None
+
+    target = os.path.abspath(path)
+    best_match = ""
+    best_type = None
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 3:
+            continue
+        mount_point = _unescape_mount_field(fields[1])
+        if target == mount_point or target.startswith(mount_point.rstrip("/") + "/"):
+            # the longest (innermost) mount point wins; later entries shadow earlier ones
+            if len(mount_point) >= len(best_match):
+                best_match = mount_point
+                best_type = fields[2]
+    if best_type is None:
+        return None
+    return best_match, best_type
+
+
+def filesystem_type(path: Path, mounts_file: Path = Path("/proc/mounts")) -> str | None:
+    """Return the type of the filesystem `path` lives on, or None if it can't be determined."""
+    mount = find_mount(path, mounts_file)
+    return mount[1] if mount is not None else None
+
+
+def is_network_filesystem(path: Path) -> bool:
+    return filesystem_type(path) in NETWORK_FS_TYPES
+
+
+class _StatPool:
+    """Daemon threads that stat entries on one mount.
+
+    A stat() stuck on an unresponsive server can't be interrupted; daemon
+    threads keep such calls from blocking interpreter exit, and the fixed
+    pool size keeps repeated listings of a dead mount from piling up more
+    stuck threads. Each mount gets its own pool, so a dead server only
+    blanks out metadata for its own mount.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.tasks: queue.SimpleQueue = queue.SimpleQueue()
+        self.started: dict[Future, float] = {}
+        self.workers: list[threading.Thread] = []
+        self.lock = threading.Lock()
+
+    def _work(self) -> None:
+        while True:
+            future, entry = self.tasks.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.started[future] = time.monotonic()
+            try:
+                future.set_result(entry.stat())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                self.started.pop(future, None)
+
+    def submit(self, entry: os.DirEntry | Path) -> Future:
+        with self.lock:
+            while len(self.workers) < self.size:
+                worker = threading.Thread(target=self._work, name="fsnek-stat", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+        future = Future()
+        self.tasks.put((future, entry))
+        return future
+
+    def stuck_workers(self, timeout: float) -> int:
+        now = time.monotonic()
+        return sum(now - start > timeout for start in list(self.started.values()))
+
+
+_stat_pools: dict[str, _StatPool] = {}
+_stat_pools_lock = threading.Lock()
+
+
+def _stat_pool(key: str) -> _StatPool:
+    with _stat_pools_lock:
+        if key not in _stat_pools:
+            _stat_pools[key] = _StatPool(STAT_WORKERS)
+        return _stat_pools[key]
+
+
+def stat_concurrently(
+    entries: list[os.DirEntry | Path],
+    timeout: float = STAT_TIMEOUT,
+) -> Iterator[tuple[os.DirEntry | Path, os.stat_result | None]]:
+    """Stat `entries` through the stat pool of their mount, yielding results as they arrive.
+
+    Yields `(entry, stat_result)` in completion order. A stat that fails, or
+    that has been running for longer than `timeout` seconds, is yielded with
+    `None`. Once every worker in the mount's pool is stuck, the remaining
+    entries are given up on as well.
+    """
+    if not entries:
+        return
+
+    mount = find_mount(Path(os.path.dirname(os.path.abspath(entries[0]))))
+    pool = _stat_pool(mount[0] if mount is not None else "")
+    pending: dict[Future, int] = {pool.submit(entry): index for index, entry in enumerate(entries)}
+    poll_interval = min(timeout, 0.25)
+
+    try:
+        while pending:
+            done, _ = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    result = future.result()
+                except (OSError, CancelledError):
+                    result = None
+                yield entries[index], result
+
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                start = pool.started.get(future)
+                if start is not None and now - start > timeout:
+                    del pending[future]
+                    yield entries[index], None
+
+            if pool.stuck_workers(timeout) >= pool.size:
+                for future, index in list(pending.items()):
+                    future.cancel()
+                    del pending[future]
+                    yield entries[index], None
+    finally:
+        for future in pending:
+            future.cancel()
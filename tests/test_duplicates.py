@@ -0,0 +1,28 @@
+import os
+from duplicates import PARTIAL_BLOCK_SIZE, find_duplicates
+
+
+def test_groups_identical_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a").write_text("same")
+    (tmp_path / "sub" / "b").write_text("same")
+    (tmp_path / "c").write_text("diff")
+    # same first and last blocks, different middle
+    (tmp_path / "big1").write_bytes(b"x" * PARTIAL_BLOCK_SIZE + b"1" + b"x" * PARTIAL_BLOCK_SIZE)
+    (tmp_path / "big2").write_bytes(b"x" * PARTIAL_BLOCK_SIZE + b"2" + b"x" * PARTIAL_BLOCK_SIZE)
+
+    assert find_duplicates(tmp_path) == [[tmp_path / "a", tmp_path / "sub" / "b"]]
+
+
+def test_hard_links_are_not_duplicates(tmp_path):
+    (tmp_path / "a").write_text("same")
+    os.link(tmp_path / "a", tmp_path / "b")
+
+    assert find_duplicates(tmp_path) == []
+
+
+def test_cancelled_search_returns_nothing(tmp_path):
+    (tmp_path / "a").write_text("same")
+    (tmp_path / "b").write_text("same")
+
+    assert find_duplicates(tmp_path, is_cancelled=lambda: True) == []
@@ -0,0 +1,100 @@
+import os
+import pytest
+import fileops
+from fileops import sync_item
+
+
+@pytest.fixture(autouse=True)
+def hash_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setattr(fileops, "_hash_cache", None)
+
+
+def make_tree(root):
+    (root / "sub").mkdir(parents=True)
+    (root / "a.txt").write_text("alpha")
+    (root / "sub" / "b.txt").write_text("beta")
+    return root
+
+
+def test_unchanged_files_are_skipped(tmp_path):
+    source = make_tree(tmp_path / "src")
+    destination = tmp_path / "dst"
+    destination.mkdir()
+
+    first = sync_item(source, destination)
+    assert first.copied_files == 2 and first.errors == []
+
+    second = sync_item(source, destination)
+    assert second.copied_files == 0
+    assert second.skipped_files == 2
+
+
+def test_checksum_detects_same_size_same_mtime_change(tmp_path):
+    source = make_tree(tmp_path / "src")
+    destination = tmp_path / "dst"
+    destination.mkdir()
+    sync_item(source, destination)
+
+    target = destination / "src" / "a.txt"
+    stat_info = target.stat()
+    target.write_text("ALPHA")
+    os.utime(target, ns=(stat_info.st_atime_ns, stat_info.st_mtime_ns))
+
+    assert sync_item(source, destination).copied_files == 0
+    report = sync_item(source, destination, checksum=True)
+    assert report.copied_files == 1
+    assert target.read_text() == "alpha"
+
+
+def test_checksum_cache_survives_a_new_process(tmp_path, monkeypatch):
+    file = tmp_path / "a.txt"
+    file.write_text("alpha")
+    digest = fileops.file_hash(file)
+
+    monkeypatch.setattr(fileops, "_hash_cache", None)
+    monkeypatch.setattr(fileops, "_hash_file", lambda path: pytest.fail("hashed again"))
+    assert fileops.file_hash(file) == digest
+
+
+def test_move_keeps_source_on_errors(tmp_path):
+    source = make_tree(tmp_path / "src")
+    destination = tmp_path / "dst"
+    (destination / "src" / "a.txt").mkdir(parents=True)
+
+    report = sync_item(source, destination, move=True)
+    assert report.errors
+    assert (source / "a.txt").exists()
+
+
+def test_unlistable_subdirectory_blocks_removal(tmp_path, monkeypatch):
+    source = make_tree(tmp_path / "src")
+    destination = tmp_path / "dst"
+    destination.mkdir()
+
+    # chmod doesn't stop root from listing a directory, so fail the listing directly
+    scandir = os.scandir
+
+    def failing_scandir(path="."):
+        if os.fspath(path) == str(source / "sub"):
+            raise PermissionError(13, "Permission denied", os.fspath(path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", failing_scandir)
+    report = sync_item(source, destination, move=True)
+    assert report.errors
+    assert (source / "sub" / "b.txt").exists()
+
+
+def test_symlinks_are_recreated(tmp_path):
+    source = make_tree(tmp_path / "src")
+    (source / "dangling").symlink_to(tmp_path / "missing")
+    (source / "link.txt").symlink_to("a.txt")
+    destination = tmp_path / "dst"
+    destination.mkdir()
+
+    report = sync_item(source, destination, move=True)
+    assert report.errors == []
+    assert os.readlink(destination / "src" / "dangling") == str(tmp_path / "missing")
+    assert os.readlink(destination / "src" / "link.txt") == "a.txt"
+    assert not source.exists()